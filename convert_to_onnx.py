@@ -0,0 +1,34 @@
+# Convert the trained RandomForest joblib artifact to ONNX for fast serving
+# Usage: python convert_to_onnx.py [model.joblib] [out.onnx] [--int8]
+#
+# ml_flask.py picks up the .onnx file automatically at startup (when
+# onnxruntime is installed) and serves it instead of the joblib model.
+# --int8 additionally writes a dynamically-quantized copy; validate its
+# accuracy drift against the labeled dataset before deploying it.
+import sys
+import joblib
+from skl2onnx import convert_sklearn
+from skl2onnx.common.data_types import FloatTensorType
+
+args = [a for a in sys.argv[1:] if a != "--int8"]
+do_int8 = "--int8" in sys.argv[1:]
+model_path = args[0] if len(args) > 0 else "rf_model_2.joblib"
+out_path = args[1] if len(args) > 1 else "rf_model_2.onnx"
+
+rf = joblib.load(model_path)
+n_features = getattr(rf, "n_features_in_", 9)
+print(f"Loaded {model_path} (n_features_in_ = {n_features})")
+
+onnx_model = convert_sklearn(
+    rf,
+    initial_types=[("input", FloatTensorType([None, n_features]))],
+)
+with open(out_path, "wb") as f:
+    f.write(onnx_model.SerializeToString())
+print(f"Wrote {out_path}")
+
+if do_int8:
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+    int8_path = out_path.replace(".onnx", "_int8.onnx")
+    quantize_dynamic(out_path, int8_path, weight_type=QuantType.QInt8)
+    print(f"Wrote {int8_path}")
@@ -2,6 +2,7 @@
 from flask import Flask, jsonify, request
 from flask_cors import CORS
 import requests
+from requests.adapters import HTTPAdapter
 import joblib
 import json
 import numpy as np
@@ -23,17 +24,46 @@ ESP32_DATA_URL = f"http://{ESP32_IP}/data"
 ESP_AUTH = ('Mokshagna', 'MLG333')   # Basic auth credentials for ESP32
 
 MODEL_PATH = "rf_model_2.joblib"
+ONNX_MODEL_PATH = "rf_model_2.onnx"   # produced by convert_to_onnx.py (optional)
 META_PATH = "model_meta_weighted_no_datetime.json"
 
+# Keep-alive session to the ESP32: reuses one TCP connection across /predict
+# calls instead of paying the handshake on every poll
+_esp_session = requests.Session()
+_esp_session.mount("http://", HTTPAdapter(pool_connections=2, pool_maxsize=2, max_retries=0))
+_esp_session.headers["Connection"] = "keep-alive"
+
 # ----- LOAD MODEL + META AT STARTUP -----
-if not os.path.exists(MODEL_PATH):
-    raise FileNotFoundError(f"Model file not found at: {MODEL_PATH}")
 if not os.path.exists(META_PATH):
     raise FileNotFoundError(f"Meta file not found at: {META_PATH}")
 
-# Load model
-model = joblib.load(MODEL_PATH)
-app.logger.info(f"Loaded model from {MODEL_PATH}. n_features_in_ = {getattr(model, 'n_features_in_', 'unknown')}")
+# Prefer the compiled ONNX predictor when available (export the joblib model
+# once with convert_to_onnx.py): onnxruntime walks the whole forest in C++
+# and is far faster than sklearn's Python-dispatched predict on small
+# batches. Without the .onnx file (or onnxruntime) we serve the joblib model.
+model = None
+_onnx_session = None
+_onnx_input = None
+if os.path.exists(ONNX_MODEL_PATH):
+    try:
+        import onnxruntime as ort
+        _onnx_session = ort.InferenceSession(ONNX_MODEL_PATH, providers=["CPUExecutionProvider"])
+        _onnx_input = _onnx_session.get_inputs()[0].name
+        app.logger.info(f"Loaded ONNX model from {ONNX_MODEL_PATH}")
+    except ImportError:
+        app.logger.info("onnxruntime not installed; falling back to joblib model")
+
+if _onnx_session is None:
+    if not os.path.exists(MODEL_PATH):
+        raise FileNotFoundError(f"Model file not found at: {MODEL_PATH}")
+    model = joblib.load(MODEL_PATH)
+    app.logger.info(f"Loaded model from {MODEL_PATH}. n_features_in_ = {getattr(model, 'n_features_in_', 'unknown')}")
+
+def _predict(arr):
+    """Run the forest on an (N, 9) float array via the fastest loaded backend."""
+    if _onnx_session is not None:
+        return _onnx_session.run(None, {_onnx_input: arr.astype(np.float32)})[0]
+    return model.predict(arr)
 
 # Load feature order metadata
 with open(META_PATH, "r") as f:
@@ -48,6 +78,41 @@ if len(FEATURE_ORDER) != 9:
     app.logger.warning(f"Meta features length is {len(FEATURE_ORDER)} (expected 9). Proceeding anyway.")
 
 # ----- HELPER: extract and build sample array -----
+KEYS = [
+    "Temperature_C",
+    "Pressure_hPa",
+    "AngleX",
+    "AngleY",
+    "AngleZ",
+    "AccX_g",
+    "AccY_g",
+    "AccZ_g",
+    "Altitude_m"
+]
+
+# Optional: numba-JIT the numeric cleanup kernel. Install numba for the
+# compiled path; without it the plain-Python version below is used as-is.
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+def _clean_sample(arr):
+    """In-place cleanup of a float[9] sample: angles (slots 2-4) -> abs,
+    rounded; returns False if any slot is non-finite (rint passes inf/NaN
+    through, so the angle slots are checked too)."""
+    for i in range(2, 5):
+        arr[i] = np.rint(np.abs(arr[i]))
+    ok = True
+    for j in range(9):
+        if not np.isfinite(arr[j]):
+            ok = False
+    return ok
+
+if njit is not None:
+    _clean_sample = njit(cache=True)(_clean_sample)
+    _clean_sample(np.zeros(9, dtype=np.float32))  # warm the JIT so the first request doesn't pay compile time
+
 def build_sample_from_esp_json(esp_json):
     """
     Extracts the nine sensor values in the strict order:
@@ -64,45 +129,26 @@ def build_sample_from_esp_json(esp_json):
     Angle negative values -> convert to positive (abs) and round to integers.
     Returns numpy array shaped (1, 9) of floats (or ints where specified).
     """
-    keys = [
-        "Temperature_C",
-        "Pressure_hPa",
-        "AngleX",
-        "AngleY",
-        "AngleZ",
-        "AccX_g",
-        "AccY_g",
-        "AccZ_g",
-        "Altitude_m"
-    ]
-
-    values = []
-    for k in keys:
+    # float32 throughout: sklearn's tree core works in float32 internally and
+    # float64 input just doubles the bandwidth before an internal downcast
+    values = np.empty(9, dtype=np.float32)
+    for i, k in enumerate(KEYS):
         if k not in esp_json:
             raise KeyError(f"Key '{k}' missing from ESP32 JSON payload")
 
         raw = esp_json[k]
         # Try to convert to float; handle strings
         try:
-            val = float(raw)
+            values[i] = float(raw)
         except Exception as e:
             # if value can't be parsed, raise a clear error
             raise ValueError(f"Cannot convert value for '{k}' to float: {raw}") from e
 
-        # For angles: convert negative to positive and round to integer
-        if k in ("AngleX", "AngleY", "AngleZ"):
-            val = abs(val)
-            val = int(round(val))
-        else:
-            # keep as float (no rounding specified)
-            # but ensure finite numeric
-            if np.isnan(val) or np.isinf(val):
-                raise ValueError(f"Non-finite value for '{k}': {raw}")
-
-        values.append(val)
+    if not _clean_sample(values):
+        bad = [KEYS[j] for j in range(9) if not np.isfinite(values[j])]
+        raise ValueError(f"Non-finite value for {', '.join(bad)}")
 
-    arr = np.array(values, dtype=float).reshape(1, -1)
-    return arr
+    return values.reshape(1, -1)
 
 # ----- /predict endpoint -----
 @app.route("/predict", methods=["GET"])
@@ -113,7 +159,7 @@ def predict():
     """
     try:
         # Fetch sensor JSON from ESP32 (with Basic Auth)
-        resp = requests.get(ESP32_DATA_URL, auth=ESP_AUTH, timeout=5)
+        resp = _esp_session.get(ESP32_DATA_URL, auth=ESP_AUTH, timeout=5)
         resp.raise_for_status()
         esp_json = resp.json()
     except requests.RequestException as e:
@@ -130,8 +176,8 @@ def predict():
         return jsonify({"error": "preprocessing_failed", "details": str(e)}), 400
 
     try:
-        # Predict (model.predict expects shape (n_samples, n_features))
-        pred = model.predict(sample)
+        # Predict (expects shape (n_samples, n_features))
+        pred = _predict(sample)
         # model.predict returns array-like; grab first element and convert to native Python type
         pred_value = pred[0]
         # Convert numpy types to Python native for JSON
@@ -149,6 +195,42 @@ def predict():
 
     return jsonify({"model_output": pred_value})
 
+# ----- /predict_batch endpoint -----
+@app.route("/predict_batch", methods=["POST"])
+def predict_batch():
+    """
+    Accept {"samples": [[...9 values...], ...]} and run model.predict once
+    over the whole (B, 9) batch. A single batched call amortizes the
+    per-call dispatch cost that dominates one-row predictions.
+    """
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict) or "samples" not in payload:
+        return jsonify({"error": "missing_samples", "details": "POST JSON with a 'samples' list of 9-value rows"}), 400
+
+    try:
+        arr = np.asarray(payload["samples"], dtype=np.float32)
+        if arr.ndim == 1 and arr.size == 9:
+            arr = arr.reshape(1, -1)
+        if arr.ndim != 2 or arr.shape[1] != 9:
+            raise ValueError(f"expected shape (B, 9), got {arr.shape}")
+        # Same preprocessing as the single-sample path: angles -> abs, rounded
+        arr[:, 2:5] = np.rint(np.abs(arr[:, 2:5]))
+        if not np.isfinite(arr).all():
+            raise ValueError("samples contain non-finite values")
+    except Exception as e:
+        app.logger.error("Batch preprocessing error: %s", e)
+        return jsonify({"error": "preprocessing_failed", "details": str(e)}), 400
+
+    try:
+        preds = _predict(arr)
+        outputs = [p.item() if isinstance(p, np.generic) else p for p in preds]
+        outputs = [p.decode("utf-8", errors="ignore") if isinstance(p, bytes) else p for p in outputs]
+    except Exception as e:
+        app.logger.error("Batch prediction failed: %s", e)
+        return jsonify({"error": "prediction_failed", "details": str(e)}), 500
+
+    return jsonify({"model_output": outputs, "count": len(outputs)})
+
 
 if __name__ == "__main__":
     # Run on all interfaces or change host as needed
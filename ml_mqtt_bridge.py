@@ -0,0 +1,93 @@
+# ml_mqtt_bridge.py
+# MQTT bridge: subscribe to ESP32 sensor readings, score each message with
+# the trained RandomForest, and publish an anomaly alert.
+import json
+import logging
+
+import joblib
+import numpy as np
+import paho.mqtt.client as mqtt
+
+# orjson decodes/encodes in C, several times faster than stdlib json at
+# MQTT message rates; fall back to stdlib when it isn't installed.
+try:
+    import orjson
+    _loads = orjson.loads
+    _dumps = orjson.dumps
+except ImportError:
+    _loads = json.loads
+    def _dumps(obj):
+        return json.dumps(obj).encode('utf-8')
+
+# ----- CONFIG -----
+MQTT_HOST = "localhost"
+MQTT_PORT = 1883
+SUB_TOPIC = "iiot/sensors"
+PUB_TOPIC = "iiot/alerts"
+
+RF_MODEL_FILE = "rf_model.joblib"
+ENC_FILE = "label_encoder.joblib"
+META_FILE = "model_meta.json"
+
+logging.basicConfig(level=logging.INFO)
+log = logging.getLogger("ml_mqtt_bridge")
+
+# ----- LOAD ARTIFACTS AT STARTUP -----
+rf = joblib.load(RF_MODEL_FILE)
+with open(META_FILE, "r") as f:
+    meta = json.load(f)
+FEATURE_ORDER = [f for f in meta.get("features", []) if f.lower() not in ("label", "result")]
+N_FEATURES = len(FEATURE_ORDER)
+log.info("Loaded model (%d features): %s", N_FEATURES, FEATURE_ORDER)
+
+# Skip sklearn's per-call feature-name validation: we always feed a plain
+# ndarray already in FEATURE_ORDER, and at MQTT message rates the check
+# costs more than the prediction itself.
+rf._check_feature_names = lambda *a, **k: None
+
+# Resolve the anomaly column of predict_proba once
+try:
+    le = joblib.load(ENC_FILE)
+    _class_names = [str(c).lower() for c in le.classes_]
+except Exception:
+    _class_names = [str(c).lower() for c in getattr(rf, "classes_", [])]
+ANOMALY_COL = _class_names.index("anomaly") if "anomaly" in _class_names else 1
+log.info("Anomaly probability column: %d (classes: %s)", ANOMALY_COL, _class_names)
+
+# ----- PREDICTION -----
+def predict_from_json(payload):
+    """
+    Score one decoded sensor payload (dict keyed by FEATURE_ORDER names).
+    Builds the model input with np.fromiter straight from the dict -- no
+    per-message DataFrame -- and returns (label, prob_anomaly).
+    """
+    arr = np.fromiter((payload[k] for k in FEATURE_ORDER),
+                      dtype=np.float32, count=N_FEATURES).reshape(1, -1)
+    prob_anomaly = float(rf.predict_proba(arr)[0, ANOMALY_COL])
+    label = "Anomaly" if prob_anomaly >= 0.5 else "Normal"
+    return label, prob_anomaly
+
+# ----- MQTT CALLBACKS -----
+def on_connect(client, userdata, flags, rc):
+    log.info("Connected to broker (rc=%s); subscribing to %s", rc, SUB_TOPIC)
+    client.subscribe(SUB_TOPIC, qos=1)
+
+def on_message(client, userdata, msg):
+    try:
+        data = _loads(msg.payload)
+        label, prob = predict_from_json(data)
+    except (ValueError, KeyError, TypeError) as e:
+        log.warning("Skipping malformed message on %s: %s", msg.topic, e)
+        return
+    alert = {"label": label, "prob_anomaly": prob}
+    client.publish(PUB_TOPIC, _dumps(alert), qos=1, retain=True)
+
+def main():
+    client = mqtt.Client()
+    client.on_connect = on_connect
+    client.on_message = on_message
+    client.connect(MQTT_HOST, MQTT_PORT, keepalive=60)
+    client.loop_forever()
+
+if __name__ == "__main__":
+    main()
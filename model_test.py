@@ -1,4 +1,10 @@
 # Robust, modular manual inference helper
+import functools
+import os
+import threading
+from collections import deque
+from concurrent.futures import Future
+
 import joblib
 import json
 import pandas as pd
@@ -12,13 +18,43 @@ META_FILE     = "model_meta.json"
 ENC_FILE      = "label_encoder.joblib"   # optional but recommended
 
 # ---------- 1) Load artifacts ----------
-model = joblib.load(RF_MODEL_FILE)
+# Deserialization is cached on (path, mtime): if this module is re-imported
+# or used from a long-lived host, each artifact is read from disk once and
+# only re-read when the file actually changes.
+@functools.lru_cache(maxsize=None)
+def _load_cached(path, mtime_ns):
+    return joblib.load(path)
+
+def _load_artifact(path):
+    return _load_cached(path, os.stat(path).st_mtime_ns)
+
+def get_artifacts():
+    """Return (model, scaler, label_encoder) through the mtime-keyed cache.
+    Missing/optional artifacts come back as None."""
+    m = _load_artifact(RF_MODEL_FILE)
+    try:
+        s = _load_artifact(SCALER_FILE)
+    except Exception:
+        s = None
+    try:
+        enc = _load_artifact(ENC_FILE)
+    except Exception:
+        enc = None
+    return m, s, enc
+
+model = _load_artifact(RF_MODEL_FILE)
 print("Loaded model. n_features_in_ =", model.n_features_in_)
 
+# The model may have been trained with n_jobs=-1 and keeps that attribute.
+# For the single-row/small-batch predictions served here, joblib's worker
+# pool costs far more than the tree walk itself, so force serial inference.
+# Only raise this (e.g. min(os.cpu_count(), 4)) for batches of ~1024+ rows.
+model.n_jobs = 1
+
 # scaler (may be None)
 scaler = None
 try:
-    scaler = joblib.load(SCALER_FILE)
+    scaler = _load_artifact(SCALER_FILE)
     print("Loaded scaler.")
 except Exception as e:
     print("No scaler loaded or failed:", e)
@@ -45,7 +81,7 @@ if len(feature_names) != model.n_features_in_:
 # Load label encoder if present
 le = None
 try:
-    le = joblib.load(ENC_FILE)
+    le = _load_artifact(ENC_FILE)
     print("Loaded LabelEncoder. classes_:", list(le.classes_))
 except Exception as e:
     print("LabelEncoder not found or failed to load:", e)
@@ -57,31 +93,30 @@ from typing import Optional
 
 def get_anomaly_index(le_obj, model_obj) -> Optional[int]:
     """Return numeric index corresponding to the 'Anomaly' class."""
-    # prefer explicit encoder
-    if le_obj is not None:
-        classes = np.array(le_obj.classes_, dtype=object)
-        match = np.where(classes == "Anomaly")[0]
-        if len(match) == 1:
-            return int(match[0])
-        # try lowercase match
-        match = np.where(np.char.lower(classes.astype(str)) == "anomaly")[0]
-        if len(match) == 1:
-            return int(match[0])
-    # fallback to model.classes_
-    if hasattr(model_obj, "classes_"):
-        classes = np.array(model_obj.classes_, dtype=object)
-        match = np.where(classes == "Anomaly")[0]
-        if len(match) == 1:
-            return int(match[0])
-        match = np.where(np.char.lower(classes.astype(str)) == "anomaly")[0]
-        if len(match) == 1:
-            return int(match[0])
+    # Case-insensitive dict lookup: prefer the explicit encoder, then
+    # model.classes_. This also tolerates non-string class entries, which
+    # the old np.char.lower scan would raise on.
+    for classes in (getattr(le_obj, "classes_", None), getattr(model_obj, "classes_", None)):
+        if classes is None:
+            continue
+        lut = {str(c).lower(): i for i, c in enumerate(classes)}
+        idx = lut.get("anomaly")
+        if idx is not None:
+            return idx
     # as last resort return None
     return None
 
 anomaly_index = get_anomaly_index(le, model)
 print("Anomaly class index (in predict_proba output):", anomaly_index)
 
+# Class metadata resolved once at import: per-call inverse_transform /
+# class-name list rebuilds are pure allocation overhead on a sensor stream.
+_CLASS_NAMES: Tuple[str, ...] = tuple(
+    str(c) for c in (le.classes_ if le is not None else getattr(model, "classes_", []))
+)
+_ANOMALY_IDX = anomaly_index
+_LABEL_LUT = np.array(_CLASS_NAMES, dtype=object)
+
 # ---------- 2) Helper: build a DataFrame sample ----------
 def build_sample_from_values(values: List[float]) -> pd.DataFrame:
     """
@@ -109,6 +144,21 @@ def prepare_for_model(X_df: pd.DataFrame) -> np.ndarray:
     Reindex X_df to the scaler/model expected order and apply scaler if present.
     Returns a numpy array suitable for model.predict/_proba.
     """
+    # Fast path: the build_sample_from_* helpers always emit columns in
+    # feature_names order, so the precomputed _PERM gather replaces the
+    # pandas fancy column-select below (which rebuilds a BlockManager and
+    # copies every column per call).
+    if list(X_df.columns) == feature_names:
+        arr = X_df.to_numpy(dtype=np.float32)
+        X_in = np.empty_like(arr)
+        X_in[:, _PERM] = arr
+        if _SCALE_INV is not None:
+            np.multiply(X_in, _SCALE_INV, out=X_in)
+            np.add(X_in, _SHIFT, out=X_in)
+        elif scaler is not None:
+            X_in = scaler.transform(X_in)
+        return X_in
+    # Slow path (misordered or extra columns): align via pandas.
     # If scaler has feature_names_in_, align to it (recommended)
     if scaler is not None and hasattr(scaler, "feature_names_in_"):
         scal_feat = list(scaler.feature_names_in_)
@@ -135,39 +185,252 @@ def prepare_for_model(X_df: pd.DataFrame) -> np.ndarray:
     if scaler is not None:
         X_in = scaler.transform(X_df)
     else:
-        X_in = X_df.values.astype(float)
+        # float32: the trees compare against float32-derived thresholds, so
+        # float64 input just doubles the bandwidth for no extra precision
+        X_in = X_df.values.astype(np.float32, copy=False)
     # final shape check
     if X_in.shape[1] != model.n_features_in_:
         raise ValueError(f"Prepared input has {X_in.shape[1]} features but model expects {model.n_features_in_}.")
     return X_in
 
+# ---------- 3b) Optional compiled forest traversal ----------
+# sklearn's predict_proba pays Python-level dispatch per estimator; walking
+# the flattened tree arrays in one numba-compiled kernel avoids all of it.
+# Install numba for the compiled path (cache=True persists the compilation
+# next to the artifacts); without it sklearn's predict_proba is used as-is.
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+    prange = range
+
+def _pack_forest(forest):
+    """Flatten every estimator's tree into shared contiguous arrays
+    (per-tree node offsets) so the traversal kernel touches no Python
+    objects. Leaf values are pre-normalized to per-tree probabilities."""
+    lefts, rights, feats, thresh, leaf_p = [], [], [], [], []
+    offsets = [0]
+    for est in forest.estimators_:
+        t = est.tree_
+        lefts.append(t.children_left)
+        rights.append(t.children_right)
+        feats.append(t.feature)
+        thresh.append(t.threshold)
+        v = t.value[:, 0, :].astype(np.float64)
+        s = v.sum(axis=1, keepdims=True)
+        s[s == 0.0] = 1.0
+        leaf_p.append(v / s)
+        offsets.append(offsets[-1] + t.node_count)
+    return (np.concatenate(lefts).astype(np.int64),
+            np.concatenate(rights).astype(np.int64),
+            np.concatenate(feats).astype(np.int64),
+            np.ascontiguousarray(np.concatenate(thresh), dtype=np.float64),
+            np.ascontiguousarray(np.concatenate(leaf_p)),
+            np.asarray(offsets, dtype=np.int64))
+
+def _forest_proba_kernel(X, left, right, feat, thresh, leaf_p, offsets, out):
+    n_trees = offsets.shape[0] - 1
+    for i in prange(X.shape[0]):
+        for t in range(n_trees):
+            base = offsets[t]
+            node = base
+            while left[node] >= 0:
+                if X[i, feat[node]] <= thresh[node]:
+                    node = base + left[node]
+                else:
+                    node = base + right[node]
+            for c in range(out.shape[1]):
+                out[i, c] += leaf_p[node, c]
+        for c in range(out.shape[1]):
+            out[i, c] /= n_trees
+
+_FOREST = None
+if njit is not None and hasattr(model, "estimators_"):
+    _forest_proba_kernel = njit(cache=True, parallel=True)(_forest_proba_kernel)
+    _FOREST = _pack_forest(model)
+    # warm the JIT so the first real sample doesn't pay compile time
+    _forest_proba_kernel(np.zeros((1, model.n_features_in_)), *_FOREST,
+                         np.zeros((1, len(model.classes_))))
+    print("Compiled forest traversal enabled (numba).")
+
+def _forest_proba(X_in) -> np.ndarray:
+    """predict_proba through the compiled kernel when available."""
+    if _FOREST is None:
+        return model.predict_proba(X_in)
+    X_in = np.ascontiguousarray(X_in, dtype=np.float64)
+    out = np.zeros((X_in.shape[0], len(model.classes_)))
+    _forest_proba_kernel(X_in, *_FOREST, out)
+    return out
+
 # ---------- 4) Helper: run prediction and return useful info ----------
-def predict_sample(X_df: pd.DataFrame, return_proba: bool=True) -> Dict[str,Any]:
-    """
-    Input: single-row DataFrame in any column order (will be aligned).
-    Returns: dict with keys: pred_numeric, pred_label, confidence_pred, prob_anomaly, proba_all
-    """
-    X_in = prepare_for_model(X_df)
-    pred = model.predict(X_in)[0]
-    proba = model.predict_proba(X_in)[0]
-    # predicted label (human-readable)
-    if le is not None:
-        pred_label = le.inverse_transform([pred])[0]
-    else:
-        # fallback -> model.classes_
-        pred_label = str(model.classes_[pred]) if hasattr(model, "classes_") else str(pred)
+def _result_from(pred, proba, return_proba_all: bool=False) -> Dict[str,Any]:
+    """Build the standard result dict from a prediction + proba row.
+    The per-class dict is only built when `return_proba_all` is set."""
+    # predicted label (human-readable) via the precomputed LUT
+    pred_label = _LABEL_LUT[pred] if len(_LABEL_LUT) else str(pred)
     confidence_pred = float(proba[pred])
-    prob_anomaly = float(proba[anomaly_index]) if anomaly_index is not None else None
-    # build human-readable proba dict
-    class_names = list(le.classes_) if le is not None else (list(model.classes_) if hasattr(model, "classes_") else [str(i) for i in range(len(proba))])
-    proba_all = { class_names[i]: float(proba[i]) for i in range(len(proba)) }
-    return {
+    prob_anomaly = float(proba[_ANOMALY_IDX]) if _ANOMALY_IDX is not None else None
+    result = {
         "pred_numeric": int(pred),
         "pred_label": pred_label,
         "confidence_pred": confidence_pred,
         "prob_anomaly": prob_anomaly,
-        "proba_all": proba_all
     }
+    if return_proba_all:
+        result["proba_all"] = { _CLASS_NAMES[i]: float(proba[i]) for i in range(len(proba)) }
+    return result
+
+def predict_sample(X_df: pd.DataFrame, return_proba: bool=True, return_proba_all: bool=False) -> Dict[str,Any]:
+    """
+    Input: single-row DataFrame in any column order (will be aligned).
+    Returns: dict with keys: pred_numeric, pred_label, confidence_pred, prob_anomaly
+    (plus proba_all when return_proba_all is set)
+    """
+    X_in = prepare_for_model(X_df)
+    proba = _forest_proba(X_in)[0]
+    pred = int(np.argmax(proba))
+    return _result_from(pred, proba, return_proba_all)
+
+# ---------- 4b) Fast single-row path (no pandas) ----------
+# Permutation from feature_names order (what callers provide) to the order
+# the scaler/model expects, computed once; the hot path just scatters into
+# a preallocated buffer.
+if scaler is not None and hasattr(scaler, "feature_names_in_"):
+    _TARGET_ORDER = list(scaler.feature_names_in_)
+elif hasattr(model, "feature_names_in_"):
+    _TARGET_ORDER = list(model.feature_names_in_)
+else:
+    _TARGET_ORDER = list(feature_names)
+_PERM = np.array([_TARGET_ORDER.index(f) for f in feature_names], dtype=np.intp)
+_BUF = np.empty((1, len(_TARGET_ORDER)), dtype=np.float32)
+
+# Pre-baked affine scaler: (x - mean) / scale == x * inv_scale + shift.
+# One in-place multiply + add replaces sklearn's transform (check_array
+# plus two temporary allocations) on the hot paths. float32 throughout:
+# it halves the bytes moved and sklearn validates to float32 anyway.
+if scaler is not None and hasattr(scaler, "mean_") and hasattr(scaler, "scale_"):
+    _SCALE_INV = (1.0 / np.asarray(scaler.scale_, dtype=np.float64)).astype(np.float32)
+    _SHIFT = (-np.asarray(scaler.mean_, dtype=np.float64) / np.asarray(scaler.scale_, dtype=np.float64)).astype(np.float32)
+else:
+    _SCALE_INV = None
+    _SHIFT = None
+
+def predict_sample_fast(values, return_proba_all: bool=False) -> Dict[str,Any]:
+    """
+    Streaming variant of predict_sample: `values` is a list/array in
+    `feature_names` order. Writes into a preallocated buffer in the
+    model's expected column order and skips pandas entirely, which
+    dominates the per-sample cost of the DataFrame path.
+    Note: reuses one buffer, so not safe for concurrent callers.
+    """
+    vals = np.asarray(values, dtype=np.float32)
+    if vals.shape[-1] != len(feature_names):
+        raise ValueError(f"Expected {len(feature_names)} values (got {vals.shape[-1]}). Feature order: {feature_names}")
+    _BUF[0, _PERM] = vals
+    if _SCALE_INV is not None:
+        np.multiply(_BUF, _SCALE_INV, out=_BUF)
+        np.add(_BUF, _SHIFT, out=_BUF)
+        X_in = _BUF
+    elif scaler is not None:
+        try:
+            X_in = scaler.transform(_BUF, copy=False)
+        except TypeError:
+            X_in = scaler.transform(_BUF)
+    else:
+        X_in = _BUF
+    proba = _forest_proba(X_in)[0]
+    pred = int(np.argmax(proba))
+    return _result_from(pred, proba, return_proba_all)
+
+def predict_from_values(values: List[float], return_proba_all: bool=False) -> Dict[str,Any]:
+    """
+    Public single-row entry point: `values` in feature_names order goes
+    straight through the preallocated-buffer path. Use this (not
+    build_sample_from_values + predict_sample) when feeding live sensor
+    rows; the DataFrame helpers remain for dict-keyed callers.
+    """
+    return predict_sample_fast(values, return_proba_all)
+
+# ---------- 4c) Micro-batching predictor ----------
+class BatchPredictor:
+    """
+    Accumulate single rows for up to `flush_ms` (or until `max_batch` rows
+    queue up) and run one scaler.transform + one predict_proba over the
+    whole batch. sklearn pays a fixed per-call dispatch cost that dwarfs
+    the actual tree walk for 1-row inputs; batching amortizes it.
+
+    Usage:
+        predictor = BatchPredictor()
+        result = predictor.submit(values).result()  # same dict as predict_sample_fast
+    """
+
+    def __init__(self, max_batch: int = 64, flush_ms: float = 5.0):
+        self.max_batch = max_batch
+        self.flush_s = flush_ms / 1000.0
+        self._buf = deque()
+        # Column-major accumulator: sklearn's tree code reads one feature
+        # column across the whole batch per split, so F-order keeps those
+        # reads contiguous instead of strided. Filled row-wise on flush.
+        self._batch = np.empty((max_batch, len(_TARGET_ORDER)), dtype=np.float32, order='F')
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, values) -> Future:
+        """Queue one row (feature_names order); returns a Future whose
+        result is the standard prediction dict."""
+        vals = np.asarray(values, dtype=np.float32)
+        if vals.shape[-1] != len(feature_names):
+            raise ValueError(f"Expected {len(feature_names)} values (got {vals.shape[-1]})")
+        fut = Future()
+        with self._lock:
+            self._buf.append((vals, fut))
+            full = len(self._buf) >= self.max_batch
+        if full:
+            self._wake.set()
+        return fut
+
+    def close(self):
+        self._closed = True
+        self._wake.set()
+        self._thread.join(timeout=2.0)
+        self._flush()
+
+    def _run(self):
+        while not self._closed:
+            self._wake.wait(self.flush_s)
+            self._wake.clear()
+            self._flush()
+
+    def _flush(self):
+        with self._lock:
+            if not self._buf:
+                return
+            items = list(self._buf)
+            self._buf.clear()
+        try:
+            B = len(items)
+            if B <= self.max_batch:
+                X = self._batch[:B]
+            else:
+                X = np.empty((B, len(_TARGET_ORDER)), dtype=np.float32, order='F')
+            for i, (v, _) in enumerate(items):
+                X[i, _PERM] = v  # scatter into the model's column order
+            if _SCALE_INV is not None:
+                np.multiply(X, _SCALE_INV, out=X)
+                np.add(X, _SHIFT, out=X)
+            elif scaler is not None:
+                X = scaler.transform(X)
+            proba = _forest_proba(X)
+            preds = np.argmax(proba, axis=1)
+        except Exception as e:
+            for _, fut in items:
+                fut.set_exception(e)
+            return
+        for i, (_, fut) in enumerate(items):
+            fut.set_result(_result_from(preds[i], proba[i]))
 
 # ---------- 5) MAIN: interactive/test usage ----------
 if __name__ == "__main__":
@@ -176,8 +439,7 @@ if __name__ == "__main__":
     values = [10.27, 973.48, -1.27, -3.63, -5391.72, 0.05, -0.002, 0.99, 336.46]
     print("Using feature order:", feature_names)
     print("Values provided:", values)
-    X_df = build_sample_from_values(values)
-    result = predict_sample(X_df)
+    result = predict_from_values(values, return_proba_all=True)
     print("\nPrediction result:")
     print(" Numeric prediction:", result['pred_numeric'])
     print(" Label prediction  :", result['pred_label'])
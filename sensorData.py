@@ -15,26 +15,160 @@ It prepends Date (YYYY-MM-DD) and Time (HH:MM:SS.mmm) to each incoming line and
 import sys
 import serial
 import time
-import datetime
-import csv
 import os
 
-if len(sys.argv) < 4:
-    print("Usage: python capture_serial_split_dt.py <serial-port> <baud> <output.csv>")
+# Optional columnar output: --format parquet writes float32 record batches
+# via pyarrow — a fraction of the CSV size, and downstream loads skip text
+# parsing entirely. Install pyarrow to enable it.
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+argv = sys.argv[1:]
+out_format = "csv"
+if "--format" in argv:
+    i = argv.index("--format")
+    if i + 1 < len(argv):
+        out_format = argv[i + 1].lower()
+    del argv[i:i + 2]
+
+if len(argv) < 3:
+    print("Usage: python capture_serial_split_dt.py <serial-port> <baud> <output.csv> [--format csv|parquet]")
     sys.exit(1)
 
-port = sys.argv[1]
-baud = int(sys.argv[2])
-outfile = sys.argv[3]
+port = argv[0]
+baud = int(argv[1])
+outfile = argv[2]
+
+if out_format == "parquet" and pa is None:
+    print("--format parquet requires pyarrow (pip install pyarrow)")
+    sys.exit(1)
 
 SER_TIMEOUT = 1.0  # serial read timeout in seconds
+FLUSH_INTERVAL = 1.0   # seconds between flushes of buffered rows
+FLUSH_MAX_ROWS = 64    # or flush after this many buffered rows
+PARQUET_BATCH_ROWS = 4096  # rows buffered per Parquet record batch
+
+DEFAULT_COLS = ["ESP_ms","Temperature_C","Pressure_hPa","AngleX","AngleY","AngleZ","AccX_g","AccY_g","AccZ_g","Altitude_m"]
+
+# Timestamp cache keyed on the integer second: localtime() + strftime only
+# run when the second rolls over, so at sensor rates most rows just append
+# fresh milliseconds to the cached "date,HH:MM:SS" prefix.
+_cached_sec = None
+_cached_prefix = b""
+
+def now_stamp_bytes():
+    """Return b"YYYY-MM-DD,HH:MM:SS.mmm" for the current moment."""
+    global _cached_sec, _cached_prefix
+    t = time.time()
+    sec = int(t)
+    if sec != _cached_sec:
+        _cached_prefix = time.strftime("%Y-%m-%d,%H:%M:%S", time.localtime(sec)).encode('ascii')
+        _cached_sec = sec
+    return _cached_prefix + b".%03d" % int((t - sec) * 1000)
+
+class ParquetSink:
+    """Columnar sink: buffers rows into per-column builders and writes a
+    record batch every PARQUET_BATCH_ROWS rows — float32 for every numeric
+    channel plus a timestamp[ms] column from the capture clock."""
 
-def now_date_time():
-    """Return tuple (date_str, time_str) where time includes milliseconds."""
-    now = datetime.datetime.now()
-    date_str = now.strftime("%Y-%m-%d")
-    time_str = now.strftime("%H:%M:%S.%f")[:-3]  # keep milliseconds
-    return date_str, time_str
+    def __init__(self, path, esp_columns):
+        self.schema = pa.schema([pa.field("timestamp", pa.timestamp('ms'))] +
+                                [pa.field(c, pa.float32()) for c in esp_columns])
+        self.writer = pq.ParquetWriter(path, self.schema)
+        self.n_cols = len(esp_columns)
+        self._reset()
+
+    def _reset(self):
+        self.ts = []
+        self.cols = [[] for _ in range(self.n_cols)]
+
+    def append(self, ts_ms, values):
+        self.ts.append(ts_ms)
+        for j in range(self.n_cols):
+            self.cols[j].append(values[j])
+        if len(self.ts) >= PARQUET_BATCH_ROWS:
+            self.flush()
+
+    def flush(self):
+        if not self.ts:
+            return
+        arrays = [pa.array(self.ts, type=pa.timestamp('ms'))] + \
+                 [pa.array(c, type=pa.float32()) for c in self.cols]
+        self.writer.write_batch(pa.record_batch(arrays, schema=self.schema))
+        self._reset()
+
+    def close(self):
+        self.flush()
+        self.writer.close()
+
+def capture_parquet(ser):
+    """Capture loop for --format parquet: same bulk-read line handling as
+    the CSV path, but rows are parsed to floats and buffered column-wise."""
+    sink = None
+    esp_columns = None
+    rx = bytearray()
+    print("Waiting for data... (press Ctrl+C to stop)")
+    try:
+        while True:
+            try:
+                chunk = ser.read(ser.in_waiting or 1)
+            except KeyboardInterrupt:
+                print("\nKeyboardInterrupt received, stopping.")
+                break
+
+            if not chunk:
+                continue
+            rx += chunk
+            if b'\n' not in chunk:
+                continue
+            complete = rx.split(b'\n')
+            rx = bytearray(complete.pop())  # keep the trailing partial
+
+            for raw in complete:
+                line = raw.decode('utf-8', errors='replace').strip()
+                if len(line) == 0:
+                    continue
+
+                # Only keep header or numeric data lines; skip ESP32 boot/debug messages
+                if not (line.startswith("ESP_CSV_HEADER:") or line[0].isdigit()):
+                    print("[DEBUG skipped]:", line)
+                    continue
+
+                if line.startswith("ESP_CSV_HEADER:"):
+                    esp_header = line[len("ESP_CSV_HEADER:"):].strip()
+                    esp_columns = [c.strip() for c in esp_header.split(',') if c.strip()]
+                    continue
+
+                if esp_columns is None:
+                    esp_columns = DEFAULT_COLS
+                    print("No header from ESP detected; using default columns.")
+                if sink is None:
+                    sink = ParquetSink(outfile, esp_columns)
+                    print("Writing Parquet columns:", ["timestamp"] + esp_columns)
+
+                parts = line.split(',')
+                if len(parts) != len(esp_columns):
+                    if '\t' in line and ',' not in line:
+                        parts = [p.strip() for p in line.split('\t')]
+                    if len(parts) < len(esp_columns):
+                        parts += [''] * (len(esp_columns) - len(parts))
+                    elif len(parts) > len(esp_columns):
+                        parts = parts[:len(esp_columns)]
+
+                values = []
+                for p in parts:
+                    try:
+                        values.append(float(p))
+                    except ValueError:
+                        values.append(float('nan'))
+                sink.append(time.time_ns() // 1_000_000, values)
+                print(line)
+    finally:
+        if sink is not None:
+            sink.close()
 
 def main():
     print(f"Opening serial port {port} @ {baud} ...")
@@ -44,13 +178,34 @@ def main():
         print(f"Failed to open serial port: {e}")
         sys.exit(1)
 
+    # Grow the OS receive buffer where supported (Windows-only in pyserial)
+    try:
+        ser.set_buffer_size(rx_size=1 << 16)
+    except Exception:
+        pass
+
+    if out_format == "parquet":
+        try:
+            capture_parquet(ser)
+        except KeyboardInterrupt:
+            print("Interrupted by user.")
+        finally:
+            try:
+                ser.close()
+            except:
+                pass
+            print("Serial port closed. Parquet saved to:", outfile)
+        return
+
     esp_columns = None
     header_written = False
     file_exists = os.path.isfile(outfile)
 
     try:
-        with open(outfile, "a", newline='') as csvfile:
-            writer = csv.writer(csvfile)
+        # Binary append + large buffer + batched flushing: the ESP lines are
+        # already comma-clean numerics, so the hot path writes preformatted
+        # bytes directly instead of paying csv.writer's per-field escaping.
+        with open(outfile, "ab", buffering=1 << 16) as csvfile:
             if file_exists:
                 print(f"Appending to existing file: {outfile}")
             else:
@@ -58,78 +213,107 @@ def main():
 
             print("Waiting for data... (press Ctrl+C to stop)")
 
-            while True:
-                try:
-                    raw = ser.readline()
-                except KeyboardInterrupt:
-                    print("\nKeyboardInterrupt received, stopping.")
-                    break
+            last_flush = time.monotonic()
+            rows_since_flush = 0
 
-                if not raw:
-                    continue
-                try:
-                    line = raw.decode('utf-8', errors='replace').strip()
-                except Exception:
-                    continue
+            # Bulk reads: ser.readline() collects one byte at a time in
+            # Python, which caps throughput well below the UART at high baud
+            # rates. Read whatever is waiting into a persistent buffer and
+            # split out complete lines; the trailing partial carries over.
+            rx = bytearray()
 
-                if len(line) == 0:
-                    continue
+            try:
+                while True:
+                    try:
+                        chunk = ser.read(ser.in_waiting or 1)
+                    except KeyboardInterrupt:
+                        print("\nKeyboardInterrupt received, stopping.")
+                        break
 
-                # Only keep header or numeric data lines; skip ESP32 boot/debug messages
-                if not (line.startswith("ESP_CSV_HEADER:") or line[0].isdigit()):
-                    print("[DEBUG skipped]:", line)  # still show in console
-                    continue
+                    if not chunk:
+                        continue
+                    rx += chunk
+                    if b'\n' not in chunk:
+                        continue
+                    complete = rx.split(b'\n')
+                    rx = bytearray(complete.pop())  # keep the trailing partial
 
-                # Detect ESP header line
-                if line.startswith("ESP_CSV_HEADER:"):
-                    esp_header = line[len("ESP_CSV_HEADER:"):].strip()
-                    esp_columns = [c.strip() for c in esp_header.split(',') if c.strip()]
-                    final_header = ["Date", "Time"] + esp_columns
-                    # If file is empty, write header
-                    if csvfile.tell() == 0:
-                        writer.writerow(final_header)
-                        csvfile.flush()
-                        header_written = True
-                        print("Wrote header:", ", ".join(final_header))
-                    else:
-                        # File exists: assume header already present; still ensure header_written flag set
-                        header_written = True
-                    continue
+                    for raw in complete:
+                        if not raw:
+                            continue
+                        try:
+                            line = raw.decode('utf-8', errors='replace').strip()
+                        except Exception:
+                            continue
 
-                # If header not yet seen, assume default columns (same order as ESP sketch)
-                if esp_columns is None:
-                    default_cols = ["ESP_ms","Temperature_C","Pressure_hPa","AngleX","AngleY","AngleZ","AccX_g","AccY_g","AccZ_g","Altitude_m"]
-                    esp_columns = default_cols
-                    final_header = ["Date", "Time"] + esp_columns
-                    if csvfile.tell() == 0:
-                        writer.writerow(final_header)
-                        csvfile.flush()
-                        header_written = True
-                        print("No header from ESP detected; wrote default header.")
-                    else:
-                        header_written = True
-
-                # Normalize separators: accept comma-separated or tab-separated
-                if '\t' in line and ',' not in line:
-                    parts = [p.strip() for p in line.split('\t')]
-                else:
-                    parts = [p.strip() for p in line.split(',')]
-
-                # Adjust parts length to esp_columns length
-                if len(parts) < len(esp_columns):
-                    parts += [''] * (len(esp_columns) - len(parts))
-                elif len(parts) > len(esp_columns):
-                    parts = parts[:len(esp_columns)]
-
-                date_str, time_str = now_date_time()
-                row = [date_str, time_str] + parts
-
-                writer.writerow(row)
-                csvfile.flush()
+                        if len(line) == 0:
+                            continue
 
-                # Print to console for live monitoring (tabular)
-                print(','.join(row))
+                        # Only keep header or numeric data lines; skip ESP32 boot/debug messages
+                        if not (line.startswith("ESP_CSV_HEADER:") or line[0].isdigit()):
+                            print("[DEBUG skipped]:", line)  # still show in console
+                            continue
 
+                        # Detect ESP header line
+                        if line.startswith("ESP_CSV_HEADER:"):
+                            esp_header = line[len("ESP_CSV_HEADER:"):].strip()
+                            esp_columns = [c.strip() for c in esp_header.split(',') if c.strip()]
+                            final_header = ["Date", "Time"] + esp_columns
+                            # If file is empty, write header
+                            if csvfile.tell() == 0:
+                                csvfile.write((','.join(final_header) + '\n').encode('ascii'))
+                                csvfile.flush()
+                                header_written = True
+                                print("Wrote header:", ", ".join(final_header))
+                            else:
+                                # File exists: assume header already present; still ensure header_written flag set
+                                header_written = True
+                            continue
+
+                        # If header not yet seen, assume default columns (same order as ESP sketch)
+                        if esp_columns is None:
+                            esp_columns = DEFAULT_COLS
+                            final_header = ["Date", "Time"] + esp_columns
+                            if csvfile.tell() == 0:
+                                csvfile.write((','.join(final_header) + '\n').encode('ascii'))
+                                csvfile.flush()
+                                header_written = True
+                                print("No header from ESP detected; wrote default header.")
+                            else:
+                                header_written = True
+
+                        # Fast path: a comma-separated line with the expected field
+                        # count needs no per-field strip (ESP output carries no
+                        # inner whitespace) and no pad/truncate pass
+                        parts = line.split(',')
+                        if len(parts) != len(esp_columns):
+                            # Rare path: tab-separated or short/long lines
+                            if '\t' in line and ',' not in line:
+                                parts = [p.strip() for p in line.split('\t')]
+                            if len(parts) < len(esp_columns):
+                                parts += [''] * (len(esp_columns) - len(parts))
+                            elif len(parts) > len(esp_columns):
+                                parts = parts[:len(esp_columns)]
+
+                        # Preformatted record: timestamp bytes + the (comma-clean)
+                        # numeric payload, written in one call
+                        rec = now_stamp_bytes() + (',' + ','.join(parts) + '\n').encode('ascii', 'replace')
+                        csvfile.write(rec)
+                        rows_since_flush += 1
+
+                        # Flush in batches (time- or count-triggered), not per row
+                        if rows_since_flush >= FLUSH_MAX_ROWS or time.monotonic() - last_flush > FLUSH_INTERVAL:
+                            csvfile.flush()
+                            last_flush = time.monotonic()
+                            rows_since_flush = 0
+
+                        # Print to console for live monitoring (tabular)
+                        print(rec[:-1].decode('ascii', 'replace'))
+
+            finally:
+                # Final flush + fsync so buffered rows survive the shutdown
+                csvfile.flush()
+                os.fsync(csvfile.fileno())
     except KeyboardInterrupt:
         print("Interrupted by user.")
     finally: